@@ -0,0 +1,144 @@
+# artifacts.py — on-disk question results produced by batch.py
+#
+# One directory per dataset, named after its fingerprint:
+#
+#   <root>/<key>/manifest.json   fingerprint, source, columns, how to decode each answer
+#                                and the version (panels.Panel.version) of the code that gave it
+#   <root>/<key>/q05_0.parquet   one Parquet file per table inside an answer
+#
+# Answers are tables (Series/DataFrame), scalars, or tuples/dicts of those;
+# the manifest records that shape so read-back yields the same objects the
+# question functions return.
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+import loader
+import panels
+
+ROOT = os.environ.get("IPL_ARTIFACTS_DIR", "artifacts")
+
+_open = loader.LRUCache()
+_open_lock = threading.Lock()
+
+
+def key_for(fingerprint):
+    return hashlib.blake2b(fingerprint.encode(), digest_size=12).hexdigest()
+
+
+def encode(obj, base, files):
+    """JSON spec of an answer; its tables are appended to `files` as (name, frame)."""
+    if isinstance(obj, pd.Series):
+        name = obj.name if obj.name is None or isinstance(obj.name, str) else str(obj.name)
+        return {"series": encode(obj.to_frame("value"), base, files)["frame"], "name": name}
+    if isinstance(obj, pd.DataFrame):
+        fname = f"{base}_{len(files)}.parquet"
+        files.append((fname, obj))
+        return {"frame": fname}
+    if isinstance(obj, tuple):
+        return {"tuple": [encode(v, base, files) for v in obj]}
+    if isinstance(obj, dict):
+        return {"dict": {k: encode(v, base, files) for k, v in obj.items()}}
+    if isinstance(obj, (float, np.floating)) and np.isnan(obj):
+        return {"value": None}
+    return {"value": obj.item() if isinstance(obj, np.generic) else obj}
+
+
+def read_frame(source):
+    """A table written by write_answer(), from a path or file object."""
+    df = pd.read_parquet(source)
+    # Parquet has no tuples; list columns (e.g. Q19's team pairs) come back as arrays
+    for c in df.columns:
+        if df[c].dtype == object and len(df) and isinstance(df[c].iloc[0], np.ndarray):
+            df[c] = df[c].map(tuple)
+    return df
+
+
+def decode(spec, read):
+    """Rebuild an answer from its spec; read(name) returns one of its tables."""
+    if "series" in spec:
+        return read(spec["series"])["value"].rename(spec["name"])
+    if "frame" in spec:
+        return read(spec["frame"])
+    if "tuple" in spec:
+        return tuple(decode(v, read) for v in spec["tuple"])
+    if "dict" in spec:
+        return {k: decode(v, read) for k, v in spec["dict"].items()}
+    return np.nan if spec["value"] is None else spec["value"]
+
+
+def write_answer(folder, qid, result):
+    """Write one answer's tables into `folder`; returns its manifest entry."""
+    files = []
+    spec = encode(result, f"q{qid:02d}", files)
+    for fname, frame in files:
+        frame.to_parquet(os.path.join(folder, fname))
+    return spec
+
+
+def staging_dir(root=ROOT):
+    os.makedirs(root, exist_ok=True)
+    return tempfile.mkdtemp(prefix=".staging-", dir=root)
+
+
+def publish(staging, manifest, root=ROOT):
+    """Write the manifest and swap the staged directory into place."""
+    with open(os.path.join(staging, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+    final = os.path.join(root, key_for(manifest["fingerprint"]))
+    if os.path.isdir(final):
+        old = final + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(final, old)
+        os.replace(staging, final)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(staging, final)
+    return final
+
+
+class Precomputed:
+    """Answers for one dataset, decoded lazily as panels ask for them."""
+
+    def __init__(self, folder, manifest):
+        self.folder = folder
+        self.manifest = manifest
+        self.columns = manifest["columns"]
+        self._specs = {int(k): v for k, v in manifest["questions"].items()}
+        self._decoded = {}
+
+    def __contains__(self, qid):
+        # an answer from other code than the running one (e.g. batch.py run before an
+        # upgrade) may have another shape; it's computed again instead
+        spec = self._specs.get(qid)
+        return spec is not None and spec.get("version") == panels.get(qid).version
+
+    def __getitem__(self, qid):
+        if qid not in self._decoded:
+            self._decoded[qid] = decode(self._specs[qid], lambda name: read_frame(os.path.join(self.folder, name)))
+        return self._decoded[qid]
+
+
+def lookup(fingerprint, root=ROOT):
+    """Precomputed answers for this dataset, or None if batch.py hasn't run on it."""
+    folder = os.path.join(root, key_for(fingerprint))
+    with _open_lock:
+        hit = _open.get((root, fingerprint))
+        if hit is not None:
+            return hit
+        try:
+            with open(os.path.join(folder, "manifest.json")) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("fingerprint") != fingerprint:
+            return None
+        pre = Precomputed(folder, manifest)
+        _open.put((root, fingerprint), pre)
+        return pre
@@ -0,0 +1,86 @@
+# batch.py — compute every dashboard question headlessly
+#
+#   python batch.py /mnt/data/matches.csv [more.csv ...] --out artifacts --workers 4
+#
+# Questions are spread over a process pool: with several inputs each worker
+# takes whole files, with one input its questions are split across workers.
+# Each worker loads its file through loader (all of them map the same Arrow
+# snapshot, so repeat loads are cheap and share memory) and writes its answers
+# straight into the dataset's staging directory; the parent then publishes the
+# manifest. Point the dashboard at the same directory (IPL_ARTIFACTS_DIR) and
+# it renders from these files instead of computing.
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import artifacts
+import loader
+import panels
+import questions  # noqa: F401  (registers the questions)
+
+
+def run_questions(path, qids, folder):
+    """Worker: answer `qids` for the CSV at `path`, writing into `folder`."""
+    df, fingerprint = loader.load_csv(path, panels.needed_columns())
+    specs = {}
+    for qid in qids:
+        p = panels.get(qid)
+        if p.available(df.columns):
+            specs[qid] = artifacts.write_answer(folder, qid, panels.result(p, df, fingerprint))
+            specs[qid]["version"] = p.version
+    return specs
+
+
+def _split(items, parts):
+    size = math.ceil(len(items) / max(parts, 1))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run(paths, out=artifacts.ROOT, workers=None):
+    """Compute all questions for each CSV in `paths`; returns the published directories."""
+    workers = workers or os.cpu_count() or 1
+    qids = [p.qid for p in panels.registered()]
+    groups = max(1, workers // len(paths))
+
+    jobs = []
+    for path in paths:
+        df, fingerprint = loader.load_csv(path, panels.needed_columns())  # also leaves a snapshot for the workers
+        jobs.append({
+            "path": path,
+            "staging": artifacts.staging_dir(out),
+            "manifest": {
+                "fingerprint": fingerprint,
+                "source": os.path.abspath(path),
+                "rows": len(df),
+                "columns": list(df.columns),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "questions": {},
+            },
+        })
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(job, pool.submit(run_questions, job["path"], chunk, job["staging"]))
+                   for job in jobs for chunk in _split(qids, groups)]
+        for job, fut in futures:
+            job["manifest"]["questions"].update(fut.result())
+
+    return [artifacts.publish(job["staging"], job["manifest"], out) for job in jobs]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Precompute all dashboard questions for one or more matches CSVs.")
+    ap.add_argument("csv", nargs="+", help="matches CSV file(s)")
+    ap.add_argument("--out", default=artifacts.ROOT, help="artifact directory (default: %(default)s)")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = ap.parse_args(argv)
+
+    for path, folder in zip(args.csv, run(args.csv, args.out, args.workers)):
+        print(f"{path} -> {folder}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
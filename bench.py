@@ -0,0 +1,140 @@
+# bench.py — time and size each stage of the dashboard on synthetic data
+#
+#   python bench.py --rows 1000000 --out bench_baseline.json
+#   python bench.py --rows 1000000 --compare bench_baseline.json
+#
+# Stages: parsing the CSV (load_csv), mapping the Arrow snapshot on a cold
+# start (load_snapshot), building the count cube from the frame (cube) or
+# straight from the CSV in chunks (stream), and each of the questions on top
+# of it (q01..q30). Each stage reports the best of --repeat
+# wall times and its peak traced allocation. The JSON written by --out is
+# stable (sorted keys, rounded numbers), so committing it as a baseline makes
+# regressions show up as a plain diff; --compare prints old vs new per stage.
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import cube
+import loader
+import panels
+import questions  # noqa: F401  (registers the questions)
+import stream
+import synth
+
+SLOWER = 1.25  # --compare flags stages slower than this ratio
+
+
+def _measure(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_mb": round(peak / 2**20, 3)}
+
+
+def run(path, repeat=3):
+    panels.set_store(None)  # time the questions themselves, not reading answers back
+    steps = {}
+    snapshot = loader.snapshot_path_for(path)
+
+    def cold_load():
+        loader.clear_cache()
+        return loader.load_csv(path, panels.needed_columns())
+
+    def parse():
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+        cold_load()
+
+    steps["load_csv"] = _measure(parse, repeat)
+    steps["load_snapshot"] = _measure(cold_load, repeat)
+    df, _ = cold_load()
+    steps["cube"] = _measure(lambda: cube.build(df), repeat)
+    steps["stream"] = _measure(lambda: stream.scan(path, cube.COLUMNS), repeat)
+
+    c = cube.build(df)
+    for p in panels.registered():
+        if not p.available(df.columns):
+            continue
+
+        def answer(p=p):
+            fingerprint = f"bench:{time.perf_counter_ns()}"
+            panels.provide(fingerprint, "cube", c)
+            panels.result(p, df, fingerprint)
+
+        steps[f"q{p.qid:02d}"] = _measure(answer, repeat)
+    return steps, df
+
+
+def compare(old, new):
+    rows = []
+    for name in sorted(set(old["steps"]) | set(new["steps"])):
+        a = old["steps"].get(name, {}).get("seconds")
+        b = new["steps"].get(name, {}).get("seconds")
+        ratio = b / a if a and b else float("nan")
+        flag = "  <- slower" if ratio > SLOWER else ""
+        rows.append(f"{name:14s} {a if a is not None else '-':>12} {b if b is not None else '-':>12} {ratio:8.2f}x{flag}")
+    return "\n".join([f"{'stage':14s} {'baseline s':>12} {'current s':>12} {'ratio':>9}"] + rows)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark loading, the count cube and each question.")
+    ap.add_argument("--csv", help="benchmark this CSV instead of generating one")
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--teams", type=int, default=10)
+    ap.add_argument("--cities", type=int, default=30)
+    ap.add_argument("--venues", type=int, default=40)
+    ap.add_argument("--skew", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", help="write results as JSON (e.g. a baseline)")
+    ap.add_argument("--compare", help="baseline JSON to compare against")
+    args = ap.parse_args(argv)
+
+    dataset = {"rows": args.rows, "teams": args.teams, "cities": args.cities, "venues": args.venues,
+               "skew": args.skew, "seed": args.seed}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.csv
+        if path is None:
+            path = os.path.join(tmp, "matches.csv")
+            synth.write_csv(path, **dataset)
+        else:
+            dataset = {"csv": os.path.abspath(path)}
+        steps, df = run(path, args.repeat)
+        dataset["frame_mb"] = round(df.memory_usage(deep=True).sum() / 2**20, 3)
+
+    result = {
+        "dataset": dataset,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "steps": steps,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=1, sort_keys=True)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), result))
+    else:
+        for name, s in steps.items():
+            print(f"{name:14s} {s['seconds'] * 1000:10.2f} ms {s['peak_mb']:10.2f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# cube.py — shared count cube over the match table
+#
+# Most questions are counts or win rates grouped by some mix of
+# City/Venue/Toss_*/Winner. Instead of re-grouping the full frame for every
+# question, build() scans it once into a compact table of counts keyed by every
+# dimension at once; questions then roll that up, which costs O(cube) rather
+# than O(rows). Counts add, so cubes built from different slices of the data
+# (e.g. rows appended later, see incremental.py) combine with merge().
+#
+# Win rates can carry a bootstrap confidence interval. Resampling a group's n
+# 0/1 outcomes with replacement and counting the hits is a Binomial draw, so
+# each block of groups is resampled as one (groups x resamples) matrix from
+# its counts alone; blocks run on a thread pool (numpy releases the GIL while
+# drawing). The resampling rate is add-one smoothed, so groups that won all or
+# none of their few matches get a wide interval rather than a zero-width one.
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import schema
+
+DIMS = ["Season", "City", "Venue", "Team1", "Team2", "Toss_Winner", "Toss_Decision", "Winner"]
+
+# Every column build() reads
+COLUMNS = DIMS + ["Win_By_Runs", "Win_By_Wickets "]
+
+# Derived 0/1 flags stored alongside the dims
+TOSS_WON = "toss_winner_won"
+BAT_WON = "won_batting_first"
+FIELD_WON = "won_fielding_first"
+
+COUNT = "n"
+
+RESAMPLES = int(os.environ.get("IPL_BOOTSTRAP_RESAMPLES", "10000"))
+LEVEL = 0.95
+
+# groups per resampling matrix: bounds memory at _BLOCK * RESAMPLES draws
+_BLOCK = 128
+_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="ipl-bootstrap")
+
+
+def build(df):
+    keys = [df[c] for c in DIMS if c in df.columns]
+    if "Toss_Winner" in df.columns and "Winner" in df.columns:
+        keys.append((df["Toss_Winner"] == df["Winner"]).rename(TOSS_WON))
+    if "Win_By_Runs" in df.columns:
+        keys.append((df["Win_By_Runs"] > 0).rename(BAT_WON))
+    if "Win_By_Wickets " in df.columns:
+        keys.append((df["Win_By_Wickets "] > 0).rename(FIELD_WON))
+    # dropna=False: rows with a missing City still count towards Venue totals
+    return df.groupby(keys, dropna=False, sort=False, observed=True).size().reset_index(name=COUNT)
+
+
+def merge(*cubes):
+    parts = [c for c in cubes if c is not None and len(c)]
+    if len(parts) <= 1:
+        return parts[0] if parts else cubes[0]
+    dims = [c for c in parts[0].columns if c != COUNT]
+    # parts may carry different category dictionaries; re-share them
+    both = schema.apply(pd.concat(parts, ignore_index=True))
+    return both.groupby(dims, dropna=False, sort=False, observed=True)[COUNT].sum().reset_index()
+
+
+def rollup(cube, by, where=None):
+    """Sum of match counts grouped by `by`; missing keys are dropped, as in df.groupby."""
+    if where is not None:
+        cube = cube[where]
+    return cube.groupby(by, observed=True)[COUNT].sum()
+
+
+def value_counts(cube, col, where=None):
+    """Equivalent of df[where][col].value_counts() (ties broken by key)."""
+    return rollup(cube, col, where).sort_values(ascending=False, kind="stable").rename("count")
+
+
+def rate(cube, by, flag, where=None, interval=False):
+    """Mean of a 0/1 flag per group, plus the number of matches behind it (and its bootstrap interval)."""
+    if where is not None:
+        cube = cube[where]
+    g = cube.assign(_hits=cube[flag] * cube[COUNT]).groupby(by, observed=True)
+    hits = g["_hits"].sum()
+    n = g[COUNT].sum()
+    out = pd.DataFrame({"mean": hits / n, "count": n})
+    if interval:
+        out["low"], out["high"] = bootstrap(hits.to_numpy(), n.to_numpy())
+    return out
+
+
+def _resample(hits, n, resamples, level, seed):
+    rng = np.random.default_rng(seed)
+    p = (hits + 1) / (n + 2)
+    draws = rng.binomial(n[:, None], p[:, None], size=(len(n), resamples))
+    return np.quantile(draws, [(1 - level) / 2, (1 + level) / 2], axis=1) / n
+
+
+def bootstrap(hits, n, resamples=RESAMPLES, level=LEVEL, seed=0):
+    """Percentile bootstrap interval of hits/n for each group, as (low, high) arrays; NaN where n == 0."""
+    # groups with the same counts have the same interval: resample each pair once
+    pairs, inverse = np.unique(np.stack([np.asarray(hits, dtype=np.int64), np.asarray(n, dtype=np.int64)]),
+                               axis=1, return_inverse=True)
+    hits, n = pairs[0].astype(float), pairs[1]
+    low = np.full(len(n), np.nan)
+    high = np.full(len(n), np.nan)
+    groups = np.flatnonzero(n > 0)
+    blocks = [groups[i:i + _BLOCK] for i in range(0, len(groups), _BLOCK)]
+    # one seed per block, so the result doesn't depend on how blocks are scheduled
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    jobs = [(hits[b], n[b], resamples, level, s) for b, s in zip(blocks, seeds)]
+    if len(jobs) > 1:
+        bounds = list(_pool.map(lambda job: _resample(*job), jobs))
+    else:
+        bounds = [_resample(*job) for job in jobs]
+    for b, (lo, hi) in zip(blocks, bounds):
+        low[b], high[b] = lo, hi
+    return low[inverse.ravel()], high[inverse.ravel()]
+
+
+def unstack(s):
+    """s.unstack(), with plain column labels: categorical ones don't survive Arrow/Parquet."""
+    wide = s.unstack()
+    if isinstance(wide.columns, pd.CategoricalIndex):
+        wide.columns = wide.columns.astype(wide.columns.categories.dtype)
+    return wide
+
+
+def complete(cube, cols):
+    # row filter equivalent to df.dropna(subset=cols)
+    return cube[cols].notna().all(axis=1)
+
+
+def team_long(cube, cols=()):
+    """Melt Team1/Team2 into a single `team` column: one row per (cell, side), carrying `cols` and the count."""
+    return cube.melt(id_vars=[*cols, COUNT], value_vars=["Team1", "Team2"], var_name="side", value_name="team")
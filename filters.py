@@ -0,0 +1,95 @@
+# filters.py — season/team/venue slicing through precomputed indexes
+#
+# A RowIndex is built once per dataset over the frame the questions read (the
+# count cube, see cube.py, or the raw rows). Its rows are sorted by Season,
+# so a season range is one contiguous slice found by binary search. For each
+# team (as Team1 or Team2) and each venue it keeps the sorted positions of
+# their rows, CSR style. A Selection then resolves to row positions by slicing
+# and intersecting those arrays, and the narrowed frame is a take() of them:
+# the cost follows the size of the selection, not of the dataset.
+import numpy as np
+
+SEASON = "Season"
+TEAMS = ["Team1", "Team2"]
+VENUE = "Venue"
+
+
+class Selection:
+    """Season range (inclusive) plus teams and venues to keep; empty parts keep everything."""
+
+    def __init__(self, seasons=None, teams=(), venues=()):
+        self.seasons = tuple(int(s) for s in seasons) if seasons is not None else None
+        self.teams = tuple(sorted(str(t) for t in teams))
+        self.venues = tuple(sorted(str(v) for v in venues))
+
+    def __bool__(self):
+        return self.seasons is not None or bool(self.teams) or bool(self.venues)
+
+    @property
+    def key(self):
+        # stable text form, used as a cache key
+        return repr((self.seasons, self.teams, self.venues))
+
+
+def _postings(frame, cols):
+    """For the shared categories of `cols`: (categories, offsets, sorted row positions)."""
+    cats = frame[cols[0]].cat.categories
+    n = len(frame)
+    codes = np.concatenate([frame[c].cat.codes.to_numpy() for c in cols]).astype(np.int64)
+    rows = np.tile(np.arange(n, dtype=np.int64), len(cols))
+    keep = codes >= 0
+    # one key per (category, row); unique() sorts and drops Team1 == Team2 repeats
+    pairs = np.unique(codes[keep] * n + rows[keep])
+    offsets = np.searchsorted(pairs // max(n, 1), np.arange(len(cats) + 1))
+    return cats, offsets, pairs % max(n, 1)
+
+
+class RowIndex:
+    def __init__(self, frame):
+        self.seasons = None
+        self.teams = None
+        self.venues = None
+        if SEASON in frame.columns:
+            order = np.argsort(frame[SEASON].to_numpy(), kind="stable")  # missing seasons sort last
+            frame = frame.take(order)
+            self.seasons = frame[SEASON].to_numpy()
+        self.frame = frame
+        if all(c in frame.columns for c in TEAMS):
+            self.teams = _postings(frame, TEAMS)
+        if VENUE in frame.columns:
+            self.venues = _postings(frame, [VENUE])
+
+    def options(self):
+        """Season bounds and team/venue names, for the filter widgets."""
+        seasons = self.seasons[~np.isnan(self.seasons)] if self.seasons is not None else []
+        return {
+            "seasons": (int(seasons.min()), int(seasons.max())) if len(seasons) else None,
+            "teams": list(self.teams[0]) if self.teams is not None else [],
+            "venues": list(self.venues[0]) if self.venues is not None else [],
+        }
+
+    def _lookup(self, postings, names, lo, hi):
+        cats, offsets, rows = postings
+        parts = []
+        for code in cats.get_indexer(list(names)):
+            if code >= 0:
+                block = rows[offsets[code]:offsets[code + 1]]
+                parts.append(block[np.searchsorted(block, lo):np.searchsorted(block, hi)])
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def positions(self, selection):
+        """Sorted positions in self.frame of the rows matching `selection`."""
+        lo, hi = 0, len(self.frame)
+        if selection.seasons is not None and self.seasons is not None:
+            first, last = selection.seasons
+            lo = np.searchsorted(self.seasons, first, side="left")
+            hi = np.searchsorted(self.seasons, last, side="right")
+        picked = None
+        for postings, names in ((self.teams, selection.teams), (self.venues, selection.venues)):
+            if names and postings is not None:
+                rows = self._lookup(postings, names, lo, hi)
+                picked = rows if picked is None else np.intersect1d(picked, rows, assume_unique=True)
+        return np.arange(lo, hi) if picked is None else picked
+
+    def narrow(self, selection):
+        return self.frame.take(self.positions(selection))
@@ -0,0 +1,172 @@
+# incremental.py — keep the count cube current as matches are appended
+#
+# During a season the matches CSV only grows. Every question is a roll-up of
+# the count cube (cube.py), and cubes merge by adding counts, so when the file
+# changes we only need to parse the bytes past the point we last read and
+# merge their cube in.
+#
+# State per CSV: the cube, how many bytes of the file it covers, and a hash of
+# those bytes. If the covered prefix still hashes the same, the change was an
+# append; anything else (an edited row, a new header, a truncated file) falls
+# back to a full rebuild. The state is kept in memory and persisted next to the
+# CSV as <csv>.cube.parquet so a restart also only reads the new rows; a state
+# written by another version of cube.build or schema.py is rebuilt instead.
+#
+# Both the full build and the appended bytes are parsed in bounded chunks on
+# a thread pool (see stream.py), so neither needs the whole file in memory.
+# A directory of CSVs (e.g. one per season) is followed file by file, and its
+# cube is the merge of theirs.
+#
+# Rows are assumed to be one line each (no quoted newlines), as in the IPL
+# exports.
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import cube
+import loader
+import schema
+import stream
+
+_STATE_KEY = b"ipl_incremental"
+# the code the persisted cube's layout comes from
+_LAYOUT = loader.layout_version(repr((cube.COLUMNS, cube.TOSS_WON, cube.BAT_WON, cube.FIELD_WON, cube.COUNT)),
+                                cube.build, schema)
+_BLOCK = 1 << 20
+
+_states = {}
+_lock = threading.Lock()
+
+
+class Aggregates:
+    """Cube for the first `offset` bytes of a CSV, plus what's needed to extend it."""
+
+    def __init__(self, cube, columns, rows, offset, prefix_hash, fingerprint):
+        self.cube = cube
+        self.columns = columns
+        self.rows = rows
+        self.offset = offset
+        self.prefix_hash = prefix_hash
+        self.fingerprint = fingerprint
+
+    def meta(self):
+        return {"columns": self.columns, "rows": self.rows, "offset": self.offset,
+                "prefix_hash": self.prefix_hash, "fingerprint": self.fingerprint}
+
+
+def state_path_for(csv_path):
+    return csv_path + ".cube.parquet"
+
+
+def _feed(h, f, length):
+    # hash the next `length` bytes of f a block at a time
+    while length > 0:
+        block = f.read(min(_BLOCK, length))
+        if not block:
+            break
+        h.update(block)
+        length -= len(block)
+    return h
+
+
+def _hash_prefix(f, length):
+    f.seek(0)
+    return _feed(hashlib.blake2b(digest_size=16), f, length)
+
+
+def _read_state(path):
+    try:
+        table = pq.read_table(state_path_for(path))
+        meta = json.loads(table.schema.metadata[_STATE_KEY])
+    except (OSError, KeyError, ValueError, pa.ArrowInvalid):
+        return None
+    if meta.pop("layout", None) != _LAYOUT:
+        return None
+    return Aggregates(schema.apply(table.to_pandas()), **meta)
+
+
+def _write_state(path, agg):
+    # Best effort, like loader's snapshots: a read-only data dir just means
+    # the next process starts with a full build.
+    target = state_path_for(path)
+    try:
+        table = pa.Table.from_pandas(agg.cube, preserve_index=False)
+        meta = dict(table.schema.metadata or {})
+        meta[_STATE_KEY] = json.dumps({**agg.meta(), "layout": _LAYOUT}).encode()
+        tmp = f"{target}.{os.getpid()}.tmp"
+        pq.write_table(table.replace_schema_metadata(meta), tmp)
+        os.replace(tmp, target)
+    except (OSError, pa.ArrowException):
+        pass
+
+
+def _rebuild(path, size, fingerprint):
+    built, rows = stream.scan(path, cube.COLUMNS, end=size)
+    with open(path, "rb") as f:
+        prefix_hash = _hash_prefix(f, size).hexdigest()
+    header = list(pd.read_csv(path, nrows=0).columns)
+    return Aggregates(built, header, rows, size, prefix_hash, fingerprint)
+
+
+def _extend(path, agg, size, fingerprint):
+    """Fold the bytes after agg.offset into agg; None if the file wasn't just appended to."""
+    if size < agg.offset:
+        return None
+    with open(path, "rb") as f:
+        h = _hash_prefix(f, agg.offset)
+        if h.hexdigest() != agg.prefix_hash:
+            return None
+        # the last row we read must have been complete
+        f.seek(agg.offset - 1)
+        if f.read(1) != b"\n":
+            return None
+        _feed(h, f, size - agg.offset)
+    # the header line is unchanged (it's in the prefix), so chunks are parsed by name
+    delta, rows = stream.scan(path, cube.COLUMNS, start=agg.offset, end=size)
+    merged = cube.merge(agg.cube, delta) if rows else agg.cube
+    return Aggregates(merged, agg.columns, agg.rows + rows, size, h.hexdigest(), fingerprint)
+
+
+def update(path=loader.DEFAULT_PATH):
+    """Count cube for the CSV at `path` (or the CSVs in it), reading only rows appended since the last call."""
+    if os.path.isdir(path):
+        return _update_dir(path)
+    key = os.path.abspath(path)
+    with _lock:
+        fingerprint = loader.fingerprint_path(path)
+        agg = _states.get(key) or _read_state(path)
+        if agg is not None and agg.fingerprint == fingerprint:
+            _states[key] = agg
+            return agg
+        size = os.path.getsize(path)
+        fresh = _extend(path, agg, size, fingerprint) if agg is not None else None
+        if fresh is None:
+            fresh = _rebuild(path, size, fingerprint)
+        _states[key] = fresh
+        _write_state(path, fresh)
+        return fresh
+
+
+def _update_dir(path):
+    key = os.path.abspath(path)
+    fingerprint = loader.fingerprint_path(path)
+    with _lock:
+        agg = _states.get(key)
+    if agg is not None and agg.fingerprint == fingerprint:
+        return agg
+    # each file keeps its own state, so a new or growing season file costs only its own rows
+    parts = [update(p) for p in loader.csv_files(path)]
+    if not parts:
+        raise FileNotFoundError(f"no CSV files in {path}")
+    columns = list(dict.fromkeys(c for p in parts for c in p.columns))
+    # offset/prefix_hash belong to single files; a directory is never extended as a whole
+    agg = Aggregates(cube.merge(*[p.cube for p in parts]), columns, sum(p.rows for p in parts),
+                     None, None, fingerprint)
+    with _lock:
+        _states[key] = agg
+    return agg
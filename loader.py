@@ -0,0 +1,228 @@
+# loader.py — cached loading of the IPL matches CSV
+#
+# Streamlit re-executes dashboard.py on every widget interaction, but imported
+# modules survive between reruns, so the cache below lives here rather than in
+# the script itself.
+#
+# Callers pass the columns they will use (panels.needed_columns()); only those
+# are parsed, by pyarrow's multithreaded reader, with string columns decoded
+# straight into categoricals. Wide exports with player, umpire and result
+# detail columns then cost no more than the dashboard uses.
+#
+# Each parsed frame is also saved as an uncompressed Arrow IPC snapshot, which
+# later loads memory-map read-only instead of parsing: numeric columns and
+# categorical codes are numpy views onto the mapped file, so every session in
+# this process and every batch.py worker reading the same snapshot shares one
+# set of physical pages. Only columns with nulls (other than categoricals) and
+# string columns are copied onto the heap. A snapshot records the parse and
+# encoding code it was written by, and one from other code is parsed again.
+import hashlib
+import inspect
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import schema
+
+DEFAULT_PATH = os.environ.get("IPL_DATA_PATH", "/mnt/data/matches.csv")
+CACHE_DIR = os.environ.get("IPL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ipl_dashboard"))
+MAX_CACHED_FRAMES = int(os.environ.get("IPL_MAX_CACHED_FRAMES", "4"))
+
+_SNAPSHOT_KEY = b"ipl_fingerprint"
+_LAYOUT_KEY = b"ipl_layout"
+
+
+class LRUCache:
+    """Small thread-safe LRU, used for parsed frames and per-dataset results."""
+
+    def __init__(self, max_entries=MAX_CACHED_FRAMES):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            df = self._items.get(key)
+            if df is not None:
+                self._items.move_to_end(key)
+            return df
+
+    def put(self, key, df):
+        with self._lock:
+            self._items[key] = df
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+_cache = LRUCache()
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def csv_files(path):
+    """The CSV at `path`, or the *.csv files in it (in name order) if it's a directory."""
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.lower().endswith(".csv")]
+
+
+def fingerprint_path(path):
+    # path + mtime + size: cheap, and changes whenever the file is rewritten
+    if os.path.isdir(path):
+        # a directory of CSVs (e.g. one per season) changes when any of them does
+        members = "\n".join(fingerprint_path(p) for p in csv_files(path))
+        return f"dir:{os.path.abspath(path)}:{hashlib.blake2b(members.encode(), digest_size=16).hexdigest()}"
+    st = os.stat(path)
+    return f"path:{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def layout_version(*parts):
+    """Hash of the source of `parts` (modules, functions, or strings such as a repr); tells files written by other code apart."""
+    h = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        h.update((part if isinstance(part, str) else inspect.getsource(part)).encode())
+    return h.hexdigest()
+
+
+def fingerprint_bytes(data):
+    return "bytes:" + hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def snapshot_path_for(csv_path=None, fingerprint=None):
+    # Snapshots of files sit next to the CSV; uploads have no home, so they go
+    # to the cache dir under their content hash.
+    if csv_path is not None:
+        return csv_path + ".arrow"
+    return os.path.join(CACHE_DIR, fingerprint.split(":", 1)[1] + ".arrow")
+
+
+def _key(fingerprint, columns):
+    # the same file read with different projections is cached separately
+    return fingerprint if columns is None else fingerprint + "|" + ",".join(sorted(columns))
+
+
+def _open(source):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def read_csv(source, columns=None):
+    """Parse a CSV (path, file or bytes), keeping only `columns`, into schema dtypes."""
+    header = pd.read_csv(_open(source), nrows=0).columns
+    usecols = [c for c in header if columns is None or c in columns]
+    if not usecols:
+        # pyarrow reads every column for usecols=[]; parse just one, for the row count
+        return read_csv(source, header[:1]).iloc[:, :0] if len(header) else pd.DataFrame()
+    try:
+        df = pd.read_csv(_open(source), engine="pyarrow", usecols=usecols, dtype=schema.dtypes(usecols))
+    except ValueError:
+        # pyarrow rejects some files the C parser copes with (ragged rows,
+        # duplicate headers); keep accepting them
+        df = pd.read_csv(_open(source), usecols=usecols, dtype=schema.dtypes(usecols))
+    return schema.apply(df)
+
+
+def _to_arrow(df):
+    # Categoricals are written with their pandas codes as the dictionary
+    # indices, including the -1 under each null (Arrow leaves those slots
+    # undefined), so _from_arrow can use the index buffer as codes directly.
+    arrays = []
+    for c in df.columns:
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            codes = s.array.codes
+            arrays.append(pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0),
+                                                         pa.array(s.cat.categories), ordered=s.cat.ordered))
+        else:
+            arrays.append(pa.array(s, from_pandas=True))
+    return pa.Table.from_arrays(arrays, names=list(df.columns))
+
+
+def _from_arrow(table):
+    cols = {}
+    for name, column in zip(table.column_names, table.columns):
+        arr = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        if pa.types.is_dictionary(arr.type) and len(arr):
+            idx = arr.indices
+            codes = np.frombuffer(idx.buffers()[1], dtype=idx.type.to_pandas_dtype(),
+                                  count=len(idx), offset=idx.offset * idx.type.bit_width // 8)
+            dtype = pd.CategoricalDtype(pd.Index(arr.dictionary.to_pandas()), arr.type.ordered)
+            cols[name] = pd.Categorical.from_codes(codes, dtype=dtype, validate=False)
+        elif arr.null_count == 0 and (pa.types.is_integer(arr.type) or pa.types.is_floating(arr.type)):
+            cols[name] = arr.to_numpy(zero_copy_only=True)
+        else:
+            cols[name] = column.to_pandas()
+    return pd.DataFrame(cols, columns=table.column_names, copy=False)
+
+
+# the code a snapshot's layout comes from: dtypes, parsing, and the Arrow encoding
+_LAYOUT = layout_version(schema, read_csv, _to_arrow, _from_arrow)
+
+
+def _read_snapshot(path, fingerprint):
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path))
+    except (OSError, pa.ArrowInvalid):
+        return None
+    meta = reader.schema.metadata or {}
+    if meta.get(_SNAPSHOT_KEY) != fingerprint.encode() or meta.get(_LAYOUT_KEY) != _LAYOUT.encode():
+        return None
+    return _from_arrow(reader.read_all())
+
+
+def _write_snapshot(df, path, fingerprint):
+    # Best effort: a read-only data dir just means no snapshot. Replacing the
+    # file doesn't disturb readers that still have the old one mapped.
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        table = _to_arrow(df).replace_schema_metadata({_SNAPSHOT_KEY: fingerprint.encode(),
+                                                       _LAYOUT_KEY: _LAYOUT.encode()})
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+    except (OSError, pa.ArrowException):
+        pass
+
+
+def _load(fingerprint, snapshot, source, columns):
+    key = _key(fingerprint, columns)
+    df = _cache.get(key)
+    if df is not None:
+        return df
+    df = _read_snapshot(snapshot, key)
+    if df is None:
+        df = read_csv(source, columns)
+        _write_snapshot(df, snapshot, key)
+        # serve the mapped copy, so this process shares pages with the others
+        mapped = _read_snapshot(snapshot, key)
+        if mapped is not None:
+            df = mapped
+    _cache.put(key, df)
+    return df
+
+
+def load_csv(path=DEFAULT_PATH, columns=None):
+    """Load a matches CSV from disk, optionally only `columns`. Returns (df, fingerprint)."""
+    fp = fingerprint_path(path)
+    return _load(fp, snapshot_path_for(path), path, columns), fp
+
+
+def load_upload(data, columns=None):
+    """Load an uploaded CSV given its raw bytes, optionally only `columns`. Returns (df, fingerprint)."""
+    fp = fingerprint_bytes(data)
+    return _load(fp, snapshot_path_for(fingerprint=fp), data, columns), fp
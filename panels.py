@@ -0,0 +1,231 @@
+# panels.py — registry of dashboard questions
+#
+# Each question is registered with the columns it needs, a compute function
+# (df -> result) and a render function (result -> st.* calls). The dashboard
+# only computes a question when its expander is open, and results are memoized
+# per dataset fingerprint so reopening a panel, or opening it from another
+# session on the same data, is free.
+#
+# A question either works on the raw rows (source="rows") or on the shared
+# count cube (source="cube", see cube.py), which is built once per dataset and
+# memoized alongside the results. The frame may be passed as a function that
+# loads it, so it is only loaded when a question reads the rows or a stage
+# has to be built from them: a cube seeded by incremental.py (itself streamed
+# in chunks, see stream.py) then never needs the full table in memory.
+#
+# With a filters.Selection, a question runs on the narrowed view of its input
+# instead: the index behind it is built once per dataset, and each selection's
+# view and results are memoized separately from the unfiltered ones.
+#
+# Below the in-process memo sits the on-disk result store (store.py), shared
+# by every process and kept across restarts. Its entries carry a hash of the
+# question's code (with the module-level helpers it calls), of the shared
+# modules its input goes through, and of the settings answers depend on.
+import hashlib
+import inspect
+import os
+import threading
+
+import cube
+import filters
+import incremental
+import loader
+import schema
+import store
+import stream
+
+_registry = {}
+
+# Shared intermediate inputs (besides the raw rows) that questions can ask for
+STAGES = {
+    "cube": cube.build,
+}
+
+# fingerprint -> {question id or stage name: result}
+_results = loader.LRUCache()
+# (fingerprint, selection key) -> {question id or "view:<source>": result}
+_filtered = loader.LRUCache(int(os.environ.get("IPL_MAX_SELECTIONS", "32")))
+_results_lock = threading.Lock()
+# (fingerprint, stage) -> function building the stage; outlives the memo above, so a
+# stage evicted with its dataset's results is rebuilt from its source, not from the rows
+_providers = loader.LRUCache(256)
+# held while building a stage or index, so concurrent callers (warmup.py) build it once
+_stage_lock = threading.RLock()
+
+# None turns persistence off (bench.py measures computing, not reading back)
+_store = store.ResultStore()
+
+# Code every answer depends on besides its own compute step: its input is parsed,
+# streamed and kept current by loader, stream and incremental
+_SHARED = (cube, filters, incremental, loader, schema, stream)
+
+
+def _settings():
+    # environment-tunable values baked into answers (the bootstrap intervals)
+    return repr((cube.RESAMPLES, cube.LEVEL))
+
+
+def _names(code):
+    yield from code.co_names
+    for const in code.co_consts:
+        if inspect.iscode(const):  # nested functions and lambdas
+            yield from _names(const)
+
+
+def _helpers(fn):
+    """fn and the functions of its module it calls, directly or through each other."""
+    found, todo = {}, [fn]
+    while todo:
+        f = todo.pop()
+        if f.__qualname__ in found:
+            continue
+        found[f.__qualname__] = f
+        for name in _names(f.__code__):
+            g = f.__globals__.get(name)
+            if inspect.isfunction(g) and g.__module__ == fn.__module__:
+                todo.append(g)
+    return [found[k] for k in sorted(found)]
+
+
+class Panel:
+    def __init__(self, qid, title, requires, optional=(), missing="Required columns missing.",
+                 compute=None, source="rows"):
+        self.qid = qid
+        self.title = title
+        self.requires = tuple(requires)
+        self.optional = tuple(optional)
+        self.missing = missing
+        self.compute = compute
+        self.source = source
+        self.renderer = None
+        self._version = None
+
+    @property
+    def columns(self):
+        return self.requires + self.optional
+
+    @property
+    def version(self):
+        if self._version is None:
+            h = hashlib.blake2b(digest_size=8)
+            for code in (*_SHARED, *_helpers(self.compute)):
+                h.update(inspect.getsource(code).encode())
+            h.update(_settings().encode())
+            self._version = h.hexdigest()
+        return self._version
+
+    def available(self, columns):
+        return all(c in columns for c in self.requires)
+
+    def render(self, fn):
+        # decorator: @q1.render
+        self.renderer = fn
+        return fn
+
+
+def question(qid, title, requires, optional=(), missing="Required columns missing.", source="rows"):
+    """Register fn as the compute step of question `qid`. fn gets the raw frame, or the named stage."""
+
+    def wrap(fn):
+        p = Panel(qid, title, requires, optional, missing, fn, source)
+        _registry[qid] = p
+        return p
+
+    return wrap
+
+
+def registered():
+    return [_registry[k] for k in sorted(_registry)]
+
+
+def get(qid):
+    return _registry[qid]
+
+
+def needed_columns(source=None):
+    """Every column some registered question (of `source`, if given) reads; the rest of a CSV needn't be parsed."""
+    return sorted({c for p in _registry.values() if source in (None, p.source) for c in p.columns})
+
+
+def _memo(key, cache=_results):
+    with _results_lock:
+        memo = cache.get(key)
+        if memo is None:
+            memo = {}
+            cache.put(key, memo)
+        return memo
+
+
+def provide(fingerprint, stage, value):
+    """Seed a stage (e.g. a cube kept current by incremental.py), or a function building it, so it isn't built from the rows."""
+    if callable(value):
+        _providers.put((fingerprint, stage), value)
+    else:
+        _memo(fingerprint).setdefault(stage, value)
+
+
+def _rows(df):
+    return df() if callable(df) else df
+
+
+def _input(source, df, fingerprint):
+    if source == "rows":
+        return _rows(df)
+    memo = _memo(fingerprint)
+    with _stage_lock:
+        if source not in memo:
+            build = _providers.get((fingerprint, source))
+            memo[source] = build() if build is not None else STAGES[source](_rows(df))
+    return memo[source]
+
+
+def index(df, fingerprint, source="cube"):
+    """The filters.RowIndex over a question input (memoized per dataset)."""
+    memo = _memo(fingerprint)
+    name = "index:" + source
+    with _stage_lock:
+        if name not in memo:
+            memo[name] = filters.RowIndex(_input(source, df, fingerprint))
+    return memo[name]
+
+
+def narrowed(df, fingerprint, selection, source="cube"):
+    """A question input restricted to `selection` (memoized per selection)."""
+    memo = _memo((fingerprint, selection.key), _filtered)
+    name = "view:" + source
+    if name not in memo:
+        memo[name] = index(df, fingerprint, source).narrow(selection)
+    return memo[name]
+
+
+def set_store(result_store):
+    """Use another ResultStore, or None to keep results in memory only."""
+    global _store
+    _store = result_store
+
+
+def _answer(panel, fingerprint, selection, compute):
+    if _store is None:
+        return compute()
+    try:
+        return _store.get(fingerprint, panel.qid, selection, panel.version)
+    except KeyError:
+        pass
+    value = compute()
+    _store.put(fingerprint, panel.qid, selection, panel.version, value)
+    return value
+
+
+def result(panel, df, fingerprint, selection=None):
+    """Compute (or fetch the memoized or stored) result of `panel` for this dataset, optionally filtered; df may be a function returning the frame."""
+    if selection:
+        memo = _memo((fingerprint, selection.key), _filtered)
+        if panel.qid not in memo:
+            memo[panel.qid] = _answer(panel, fingerprint, selection.key,
+                                      lambda: panel.compute(narrowed(df, fingerprint, selection, panel.source)))
+        return memo[panel.qid]
+    memo = _memo(fingerprint)
+    if panel.qid not in memo:
+        memo[panel.qid] = _answer(panel, fingerprint, "",
+                                  lambda: panel.compute(_input(panel.source, df, fingerprint)))
+    return memo[panel.qid]
@@ -0,0 +1,102 @@
+# profiling.py — opt-in timing of the dashboard's load step and panels
+#
+# Enabled with ?profile=1 in the URL or IPL_PROFILE=1 in the environment.
+# Each measured block records wall time, CPU time of the running thread and
+# the peak traced allocation (tracemalloc); the dashboard shows the records in
+# the sidebar and appends them to a JSON-lines log (IPL_PROFILE_LOG, default
+# profile.jsonl) for aggregation across sessions.
+#
+# A block can fill in its record itself (measure() yields a dict merged into
+# it): a panel served by warm-up (warmup.py) only waited for a pool thread, so
+# it reports that job's CPU time, and no peak, which the waiting can't tell.
+#
+# tracemalloc is process-wide: it runs only while some session is profiling,
+# and the peaks of sessions profiling at the same moment overlap.
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+LOG_PATH = os.environ.get("IPL_PROFILE_LOG", "profile.jsonl")
+
+_TRUE = ("1", "true", "yes", "on")
+
+_tracing = 0
+_tracing_lock = threading.Lock()
+
+
+def enabled(query_params=None):
+    if os.environ.get("IPL_PROFILE", "").lower() in _TRUE:
+        return True
+    return query_params is not None and str(query_params.get("profile", "")).lower() in _TRUE
+
+
+def _start_tracing():
+    global _tracing
+    with _tracing_lock:
+        if _tracing == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing += 1
+
+
+def _stop_tracing():
+    global _tracing
+    with _tracing_lock:
+        _tracing -= 1
+        if _tracing == 0:
+            tracemalloc.stop()
+
+
+class Profiler:
+    """Collects one record per measured block for a single script run."""
+
+    def __init__(self, enabled=False, session=None):
+        self.enabled = enabled
+        self.session = session
+        self.records = []
+
+    def measure(self, name, **extra):
+        if not self.enabled:
+            return contextlib.nullcontext({})
+        return self._measure(name, extra)
+
+    @contextlib.contextmanager
+    def _measure(self, name, extra):
+        _start_tracing()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.thread_time()
+        filled = {}
+        try:
+            yield filled
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            peak = tracemalloc.get_traced_memory()[1] - base
+            _stop_tracing()
+            self.records.append({
+                "ts": time.time(),
+                "session": self.session,
+                "step": name,
+                "wall_ms": round(wall * 1000, 3),
+                "cpu_ms": round(cpu * 1000, 3),
+                "peak_mb": round(max(peak, 0) / 2**20, 3),
+                **extra,
+                **filled,
+            })
+
+    def table(self):
+        cols = ["step", "wall_ms", "cpu_ms", "peak_mb", "served", "compute_ms"]
+        if not self.records:
+            return pd.DataFrame(columns=cols)
+        return pd.DataFrame(self.records).reindex(columns=cols).sort_values("wall_ms", ascending=False, ignore_index=True)
+
+    def export(self, path=LOG_PATH):
+        if not self.records:
+            return
+        with open(path, "a") as f:
+            # one write per run keeps concurrent sessions from interleaving lines
+            f.write("".join(json.dumps(r) + "\n" for r in self.records))
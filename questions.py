@@ -0,0 +1,344 @@
+# questions.py — compute steps of the 30 dashboard questions
+#
+# Each question is registered with the columns it needs and returns plain
+# pandas objects; dashboard.py attaches the st.* rendering. Questions with
+# source="cube" get the shared count cube (cube.py) instead of the raw frame.
+import numpy as np
+import pandas as pd
+
+import cube
+from panels import question as q
+
+
+def _interval_of(rates, best):
+    """Bootstrap bounds of each group's `best` decision, and whether they clear every other decision's."""
+    low = cube.unstack(rates["low"]).reindex(best.index)
+    high = cube.unstack(rates["high"]).reindex(best.index)
+    chosen = high.columns.to_numpy()[None, :] == best.to_numpy()[:, None]
+    rows, pick = np.arange(len(best)), high.columns.get_indexer(best)
+    best_low, best_high = low.to_numpy()[rows, pick], high.to_numpy()[rows, pick]
+    others_high = high.mask(chosen).max(axis=1).to_numpy()
+    return best_low, best_high, best_low > others_high
+
+
+# 1) Which team won the most matches in 2008?
+@q(1, "🏆 Which team won the most matches in 2008?", requires=["Season", "Winner"],
+   missing="Columns 'Season' and/or 'Winner' missing.", source="cube")
+def q1(c):
+    return cube.value_counts(c, "Winner", c["Season"] == 2008)
+
+
+# 2) Which city hosted the highest number of matches?
+@q(2, "🌆 Which city hosted the highest number of matches?", requires=["City"],
+   missing="Column 'City' missing.", source="cube")
+def q2(c):
+    return cube.value_counts(c, "City")
+
+
+# 3) Which team won more often while batting first?
+@q(3, "🔥 Which team won more often while batting first?", requires=["Win_By_Runs", "Winner"],
+   missing="Columns 'Win_By_Runs' and/or 'Winner' missing.", source="cube")
+def q3(c):
+    return cube.value_counts(c, "Winner", c[cube.BAT_WON])
+
+
+# 4) Which team won more often while fielding first?
+@q(4, "🎯 Which team won more often while fielding first?", requires=["Win_By_Wickets ", "Winner"],
+   missing="Columns 'Win_By_Wickets' and/or 'Winner' missing.", source="cube")
+def q4(c):
+    return cube.value_counts(c, "Winner", c[cube.FIELD_WON])
+
+
+# 5) Does winning the toss increase the chance of winning the match?
+@q(5, "🪙 Does winning the toss increase the chance of winning the match?", requires=["Toss_Winner", "Winner"],
+   missing="Columns 'Toss_Winner' and/or 'Winner' missing.", source="cube")
+def q5(c):
+    toss_same = cube.value_counts(c, cube.TOSS_WON).rename_axis(None)
+    low, high = cube.bootstrap([toss_same.get(True, 0)], [toss_same.sum()])
+    pct = toss_same.get(True, 0) / toss_same.sum() * 100 if toss_same.sum() > 0 else np.nan
+    return pct, toss_same, (low[0] * 100, high[0] * 100)
+
+
+# 6) Which toss decision (bat or field) leads to more wins?
+@q(6, "📊 Which toss decision (bat or field) leads to more wins?", requires=["Toss_Decision", "Toss_Winner", "Winner"],
+   missing="Columns 'Toss_Decision', 'Toss_Winner' or 'Winner' missing.", source="cube")
+def q6(c):
+    stats = cube.rate(c, "Toss_Decision", cube.TOSS_WON, interval=True)
+    stats = stats.rename(columns={"mean": "win_rate", "count": "matches"})[["win_rate", "low", "high", "matches"]]
+    return stats.sort_values("win_rate", ascending=False, kind="stable")
+
+
+# 7) Which stadium hosted the most matches in the dataset?
+@q(7, "🏟️ Which stadium hosted the most matches in the dataset?", requires=["Venue"],
+   missing="Column 'Venue' missing.", source="cube")
+def q7(c):
+    return cube.value_counts(c, "Venue")
+
+
+# 8) Which venue saw the most wins for home teams?
+@q(8, "🏠 Which venue saw the most wins for home teams?", requires=["Venue", "Team1", "Winner"],
+   missing="Columns 'Venue'/'Team1'/'Winner' missing.", source="cube")
+def q8(c):
+    return cube.value_counts(c, "Venue", c["Team1"] == c["Winner"])
+
+
+# 9) Which venue saw the most wins for away teams?
+@q(9, "🚀 Which venue saw the most wins for away teams?", requires=["Venue", "Team2", "Winner"],
+   missing="Columns 'Venue'/'Team2'/'Winner' missing.", source="cube")
+def q9(c):
+    return cube.value_counts(c, "Venue", c["Team2"] == c["Winner"])
+
+
+# 10) Is there any relationship between toss winner and match winner?
+@q(10, "🔗 Is there any relationship between toss winner and match winner?", requires=["Toss_Winner", "Winner"],
+   missing="Columns 'Toss_Winner' and/or 'Winner' missing.", source="cube")
+def q10(c):
+    return cube.rollup(c, ["Toss_Winner", "Winner"]).reset_index(name="count").sort_values("count", ascending=False)
+
+
+# 11) Which team had the highest win percentage in this dataset?
+@q(11, "📈 Which team had the highest win percentage in this dataset?", requires=["Winner", "Team1", "Team2"],
+   missing="Columns 'Team1'/'Team2'/'Winner' missing.", source="cube")
+def q11(c):
+    appearances = cube.rollup(cube.team_long(c), "team")
+    wins = cube.rollup(c, "Winner")
+    stats = pd.DataFrame({"appearances": appearances, "wins": wins}).fillna(0).astype(int).sort_index()
+    stats["win_pct"] = (stats["wins"] / stats["appearances"] * 100).where(stats["appearances"] > 0)
+    stats_df = stats.rename_axis("team").reset_index()
+    return stats_df.sort_values("win_pct", ascending=False)
+
+
+# 12) How often did the team winning the toss lose the match?
+@q(12, "❓ How often did the team winning the toss lose the match?", requires=["Toss_Winner", "Winner"],
+   missing="Columns 'Toss_Winner'/'Winner' missing.", source="cube")
+def q12(c):
+    toss_same = cube.value_counts(c, cube.TOSS_WON).rename_axis(None)
+    toss_lost = toss_same.rename(index={True: False, False: True})
+    return toss_lost.get(True, 0) / toss_lost.sum() * 100 if toss_lost.sum() > 0 else np.nan, toss_lost
+
+
+# 13) Which city's teams performed the best overall?
+@q(13, "🏙️ Which city's teams performed the best overall?", requires=["City", "Winner"],
+   missing="Columns 'City'/'Winner' missing.", source="cube")
+def q13(c):
+    city_team = cube.rollup(c, ["City","Winner"]).reset_index(name="wins")
+    return city_team.loc[city_team.groupby("City")["wins"].idxmax()].sort_values("wins", ascending=False)
+
+
+# 14) Percentage won by batting first vs fielding first
+@q(14, "⚖️ What percentage of matches were won by batting first versus fielding first?",
+   requires=["Win_By_Runs", "Win_By_Wickets "],
+   missing="Columns 'Win_By_Runs' and/or 'Win_By_Wickets' missing.", source="cube")
+def q14(c):
+    n = c[cube.COUNT]
+    return n[c[cube.BAT_WON]].sum(), n[c[cube.FIELD_WON]].sum()
+
+
+# 15) Which team lost the most tosses but still won matches?
+@q(15, "🏅 Which team lost the most tosses but still won matches?", requires=["Toss_Winner", "Winner", "Team1", "Team2"], source="cube")
+def q15(c):
+    long = cube.team_long(c.assign(same=c["Team1"] == c["Team2"]), ["Toss_Winner", "same"])
+    # a team listed on both sides still only played that match once
+    long = long[~(long["same"] & (long["side"] == "Team2"))]
+    teams = cube.value_counts(long, "team").index
+    toss_lost = cube.rollup(long, "team", long["Toss_Winner"] != long["team"])
+    wins = cube.rollup(c, "Winner")
+    tl_df = pd.DataFrame({
+        "team": teams,
+        "tosses_lost_while_playing": toss_lost.reindex(teams, fill_value=0).to_numpy(),
+        "wins": wins.reindex(teams, fill_value=0).to_numpy(),
+    })
+    return tl_df.sort_values("tosses_lost_while_playing", ascending=False)
+
+
+# 16) Are there cities where fielding first gives a higher chance of winning?
+@q(16, "🧭 Are there cities where fielding first gives a higher chance of winning?",
+   requires=["City", "Toss_Decision", "Toss_Winner", "Winner"], source="cube")
+def q16(c):
+    full = cube.complete(c, ["City","Toss_Decision","Toss_Winner","Winner"])
+    rates = cube.rate(c, ["City","Toss_Decision"], cube.TOSS_WON, full, interval=True)
+    stats = cube.unstack(rates["mean"]).fillna(0)
+    if "field" not in stats:
+        # no one chose to field (e.g. in a narrow filtered selection)
+        return stats.iloc[:0]
+    low, high = cube.unstack(rates["low"]), cube.unstack(rates["high"])
+    for dec in ["bat", "field"]:
+        if dec in low:
+            stats[f"{dec}_low"], stats[f"{dec}_high"] = low[dec], high[dec]
+    # clear: the field interval lies above the bat one
+    stats["clear"] = stats["field_low"] > stats.get("bat_high", np.nan)
+    # cities where field rate > bat rate
+    cond = stats[(stats["field"] > stats.get("bat",0))]
+    return cond.sort_values("field", ascending=False)
+
+
+# 17) Which toss decision is more successful at each venue?
+@q(17, "🏟️ Which toss decision is more successful at each venue?",
+   requires=["Venue", "Toss_Decision", "Toss_Winner", "Winner"], source="cube")
+def q17(c):
+    full = cube.complete(c, ["Venue","Toss_Decision","Toss_Winner","Winner"])
+    rates = cube.rate(c, ["Venue","Toss_Decision"], cube.TOSS_WON, full, interval=True)
+    stats_v = cube.unstack(rates["mean"]).fillna(0)
+    best = stats_v.idxmax(axis=1)
+    low, high, clear = _interval_of(rates, best)
+    return best.reset_index().rename(columns={0:"best_decision"}).assign(low=low, high=high, clear=clear)
+
+
+# 18) Which team won matches most frequently in their home city?
+@q(18, "🏘️ Which team won matches most frequently in their home city?", requires=["City", "Team1", "Winner"], source="cube")
+def q18(c):
+    home = cube.rollup(c, ["City","Team1"], c["Team1"] == c["Winner"])
+    return home.reset_index(name="home_wins").sort_values("home_wins", ascending=False)
+
+
+# 19) Which opponent teams faced each other most often?
+@q(19, "🔁 Which opponent teams faced each other most often?", requires=["Team1", "Team2"],
+   missing="Columns 'Team1'/'Team2' missing.", source="cube")
+def q19(c):
+    # order-free pair key: codes into the sorted team list, so min/max == sorted()
+    teams = pd.Index(pd.unique(pd.concat([c["Team1"], c["Team2"]]).dropna())).sort_values()
+    a = teams.get_indexer(c["Team1"])
+    b = teams.get_indexer(c["Team2"])
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    known = lo >= 0
+    keyed = pd.DataFrame({"lo": lo[known], "hi": hi[known], "count": c[cube.COUNT].to_numpy()[known]})
+    counts = keyed.groupby(["lo","hi"])["count"].sum().sort_values(ascending=False, kind="stable")
+    pairs = zip(teams[counts.index.get_level_values("lo")], teams[counts.index.get_level_values("hi")])
+    return pd.DataFrame({"pair": list(pairs), "count": counts.to_numpy()})
+
+
+# 20) Are there stadiums where the same team keeps winning?
+@q(20, "🏆 Are there stadiums where the same team keeps winning?", requires=["Venue", "Winner"],
+   missing="Columns 'Venue'/'Winner' missing.", source="cube")
+def q20(c):
+    v = cube.rollup(c, ["Venue","Winner"]).reset_index(name="wins")
+    total_v = cube.rollup(c, "Venue").reset_index(name="total")
+    merged = v.merge(total_v, on="Venue")
+    merged["prop"] = merged["wins"] / merged["total"]
+    return merged[(merged["prop"] >= 0.6) & (merged["total"] >= 6)].sort_values(["prop","wins"], ascending=False)
+
+
+# 21) Average number of matches per city
+@q(21, "📊 What is the average number of matches played per city?", requires=["City"],
+   missing="Column 'City' missing.", source="cube")
+def q21(c):
+    return cube.value_counts(c, "City")
+
+
+# 22) Which teams appeared in the most matches?
+@q(22, "🔎 Which teams appeared in the most matches?", requires=["Team1", "Team2"],
+   missing="Columns 'Team1'/'Team2' missing.", source="cube")
+def q22(c):
+    return cube.value_counts(cube.team_long(c), "team").rename_axis(None)
+
+
+# 23) Which team won the most matches after losing the toss?
+@q(23, "🥇 Which team won the most matches after losing the toss?", requires=["Toss_Winner", "Winner"],
+   missing="Columns 'Toss_Winner'/'Winner' missing.", source="cube")
+def q23(c):
+    return cube.value_counts(c, "Winner", ~c[cube.TOSS_WON])
+
+
+# 24) Are there cities or venues where toss winner always won?
+@q(24, "🔒 Are there cities or venues where the toss winner always won the match?",
+   requires=["Toss_Winner", "Winner"], optional=["City", "Venue"],
+   missing="Columns for city-level check missing.", source="cube")
+def q24(c):
+    always = {}
+    for key in ("City", "Venue"):
+        if key in c.columns:
+            per_key = c.groupby(key, observed=True)[cube.TOSS_WON].all().reset_index(name="always")
+            always[key] = per_key[per_key["always"]==True]
+    return always
+
+
+# 25) % matches where toss-winner chose bat and won
+@q(25, "⚖️ What percentage of matches were won by the team that chose to bat?",
+   requires=["Toss_Decision", "Toss_Winner", "Winner"], source="cube")
+def q25(c):
+    chose_bat = c["Toss_Decision"]=="bat"
+    chosen_bat_total = c.loc[chose_bat, cube.COUNT].sum()
+    chosen_bat_and_won = c.loc[chose_bat & c[cube.TOSS_WON], cube.COUNT].sum()
+    low, high = cube.bootstrap([chosen_bat_and_won], [chosen_bat_total])
+    pct = chosen_bat_and_won / chosen_bat_total * 100 if chosen_bat_total>0 else np.nan
+    return pct, (low[0] * 100, high[0] * 100)
+
+
+# 26) % matches where toss-winner chose field and won
+@q(26, "⚖️ What percentage of matches were won by the team that chose to field?",
+   requires=["Toss_Decision", "Toss_Winner", "Winner"], source="cube")
+def q26(c):
+    chose_field = c["Toss_Decision"]=="field"
+    chosen_field_total = c.loc[chose_field, cube.COUNT].sum()
+    chosen_field_and_won = c.loc[chose_field & c[cube.TOSS_WON], cube.COUNT].sum()
+    low, high = cube.bootstrap([chosen_field_and_won], [chosen_field_total])
+    pct = chosen_field_and_won / chosen_field_total * 100 if chosen_field_total>0 else np.nan
+    return pct, (low[0] * 100, high[0] * 100)
+
+
+# 27) Most balanced win distribution among teams in a city
+@q(27, "⚖️ Which city has the most balanced win distribution among teams?", requires=["City", "Winner"],
+   missing="Columns 'City'/'Winner' missing.", source="cube")
+def q27(c):
+    wins = cube.rollup(c, ["City","Winner"]).groupby(level="City", observed=True)
+    stats = pd.DataFrame({"total_matches": wins.sum(), "mean": wins.mean(), "std": wins.std(ddof=0)})
+    stats = stats[stats["total_matches"] >= 10]
+    bal_df = pd.DataFrame({
+        "city": stats.index,
+        "total_matches": stats["total_matches"].to_numpy(),
+        "rel_std": (stats["std"] / stats["mean"]).to_numpy(),
+    })
+    return bal_df.dropna().sort_values("rel_std")
+
+
+# 28) Cities where one team dominated completely
+@q(28, "🔔 Are there any cities where one team dominated completely?", requires=["City", "Winner"],
+   missing="Columns missing.", source="cube")
+def q28(c):
+    city_tot = cube.rollup(c, "City").reset_index(name="total")
+    city_team = cube.rollup(c, ["City","Winner"]).reset_index(name="wins")
+    merged = city_team.merge(city_tot, on="City")
+    merged["prop"] = merged["wins"] / merged["total"]
+    return merged[(merged["prop"] >= 0.75) & (merged["total"] >= 8)].sort_values("prop", ascending=False)
+
+
+# 29) Overall toss-winning trends for top-performing teams
+@q(29, "📈 What are the overall toss-winning trends for top-performing teams?", requires=["Winner", "Toss_Winner"],
+   missing="Columns missing.", source="cube")
+def q29(c):
+    top_wins = cube.value_counts(c, "Winner").head(10)
+    toss_trends = cube.value_counts(c, "Toss_Winner", c["Toss_Winner"].isin(top_wins.index))
+    return top_wins, toss_trends
+
+
+# 30) Ideal toss decision for each city
+@q(30, "🧠 Based on current data, what would be the ideal toss decision for a team playing in each city?",
+   requires=["City", "Toss_Decision", "Toss_Winner", "Winner"],
+   missing="Required columns missing for city-level ideal decision.", source="cube")
+def q30(c):
+    t = c[cube.complete(c, ["City","Toss_Decision","Toss_Winner","Winner"])]
+    # Toss_Decision is already lowercase/stripped (schema.py)
+    stats = cube.rate(t, ["City","Toss_Decision"], cube.TOSS_WON, interval=True)
+    pivot = cube.unstack(stats["mean"]).fillna(0)
+    counts = cube.unstack(stats["count"]).fillna(0)
+    # prefer the best decision with >=3 samples, else the best overall
+    enough = pivot.where(counts >= 3)
+    has_enough = enough.notna().any(axis=1)
+    best = enough.fillna(-1).idxmax(axis=1).where(has_enough, pivot.idxmax(axis=1))
+    best_rate = enough.max(axis=1).where(has_enough, pivot.max(axis=1))
+    low, high, clear = _interval_of(stats, best)
+
+    def n(dec):
+        return counts[dec].astype(int).to_numpy() if dec in counts else np.zeros(len(counts), dtype=int)
+
+    ideal_df = pd.DataFrame({
+        "City": pivot.index,
+        "ideal_decision": best.to_numpy(),
+        "win_rate": best_rate.astype(float).to_numpy(),
+        "bat_n": n("bat"),
+        "field_n": n("field"),
+        "low": low,
+        "high": high,
+        "clear": clear,
+    })
+    return ideal_df.sort_values("win_rate", ascending=False)
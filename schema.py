@@ -0,0 +1,54 @@
+# schema.py — compact dtypes for the match table, applied right after parsing
+#
+# The four team columns share one sorted categorical dictionary, so
+# Toss_Winner == Winner and friends compare integer codes instead of Python
+# strings. City, Venue and Toss_Decision become categoricals too, with
+# Toss_Decision normalized to lowercase/stripped once here rather than in
+# every question. Integer columns are downcast.
+#
+# apply() is idempotent and also accepts frames holding only some of these
+# columns (e.g. a count cube), so results of concatenating differently-encoded
+# frames can be brought back to the shared encoding.
+import numpy as np
+import pandas as pd
+
+TEAM_COLUMNS = ["Team1", "Team2", "Toss_Winner", "Winner"]
+CATEGORY_COLUMNS = ["City", "Venue", "Toss_Decision"]
+INT_COLUMNS = ["Season", "Win_By_Runs", "Win_By_Wickets "]
+
+
+def _normalized(s):
+    cats = s.cat.categories
+    norm = pd.Index(cats.astype(str)).str.lower().str.strip()
+    if norm.equals(cats) and cats.is_monotonic_increasing:
+        return s
+    new = pd.Index(norm.unique()).sort_values()
+    codes = s.cat.codes.to_numpy()
+    remap = new.get_indexer(norm)
+    return pd.Series(pd.Categorical.from_codes(np.where(codes >= 0, remap[codes], -1), new),
+                     index=s.index, name=s.name)
+
+
+def dtypes(columns):
+    """Parser dtypes for `columns`: string columns are read straight into categoricals."""
+    return {c: "category" for c in columns if c in TEAM_COLUMNS or c in CATEGORY_COLUMNS}
+
+
+def apply(df):
+    out = {}
+    teams = [df[c].astype("category") for c in TEAM_COLUMNS if c in df.columns]
+    if teams:
+        shared = teams[0].cat.categories
+        for s in teams[1:]:
+            shared = shared.union(s.cat.categories)
+        shared = shared.sort_values()
+        for s in teams:
+            out[s.name] = s if s.cat.categories.equals(shared) else s.cat.set_categories(shared)
+    for c in CATEGORY_COLUMNS:
+        if c in df.columns:
+            s = df[c].astype("category")
+            out[c] = _normalized(s) if c == "Toss_Decision" else s
+    for c in INT_COLUMNS:
+        if c in df.columns and pd.api.types.is_integer_dtype(df[c]):
+            out[c] = pd.to_numeric(df[c], downcast="integer")
+    return df.assign(**out)
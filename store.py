@@ -0,0 +1,156 @@
+# store.py — question results persisted on disk, shared across processes
+#
+# panels.py memoizes results inside one process; this keeps them on disk as
+# well, so once any session has answered a question for a dataset (and filter
+# selection) every other session, batch.py worker or restarted server reads
+# the answer back instead of computing it. Entries are keyed by dataset
+# fingerprint, question id, selection and a hash of the code behind the
+# question, so editing a question only invalidates its own entries.
+#
+# The store is one SQLite database (IPL_RESULT_STORE, default under loader's
+# cache dir) in WAL mode: readers don't block each other or the writer,
+# writers take turns on SQLite's lock, and each entry is written in one
+# transaction. Answers are encoded as in artifacts.py, as a JSON spec plus
+# Parquet tables. Once the total size passes IPL_RESULT_STORE_MB, the least
+# recently used entries are evicted.
+#
+# Like loader's snapshots the store is best effort: any database error is a
+# miss on read and a no-op on write.
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pyarrow as pa
+
+import artifacts
+import loader
+
+PATH = os.environ.get("IPL_RESULT_STORE", os.path.join(loader.CACHE_DIR, "results.sqlite"))
+MAX_BYTES = int(os.environ.get("IPL_RESULT_STORE_MB", "256")) * 2**20
+
+# last-use times are only rewritten when older than this, so hot reads stay reads
+_TOUCH_AFTER = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    qid INTEGER NOT NULL,
+    selection TEXT NOT NULL,
+    version TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL,
+    UNIQUE (fingerprint, qid, selection, version)
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+CREATE TABLE IF NOT EXISTS tables (
+    result INTEGER NOT NULL REFERENCES results (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (result, name)
+);
+"""
+
+
+class ResultStore:
+    """Answers on disk, keyed by (fingerprint, qid, selection, version)."""
+
+    def __init__(self, path=PATH, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn = None
+        # one connection per process, shared by the session threads in turn
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            db.executescript(_SCHEMA)
+            self._conn = db
+        return self._conn
+
+    def get(self, fingerprint, qid, selection, version):
+        """The stored answer; raises KeyError if there is none."""
+        try:
+            with self._lock:
+                row, tables = self._read(fingerprint, qid, selection, version)
+        except (OSError, sqlite3.Error):
+            raise KeyError(qid)
+        if row is None:
+            raise KeyError(qid)
+        try:
+            return artifacts.decode(json.loads(row), lambda name: artifacts.read_frame(io.BytesIO(tables[name])))
+        except (KeyError, ValueError, OSError, pa.ArrowException):
+            # written by an incompatible version of the encoding
+            raise KeyError(qid)
+
+    def _read(self, fingerprint, qid, selection, version):
+        db = self._db()
+        row = db.execute("SELECT id, spec, used FROM results "
+                         "WHERE fingerprint = ? AND qid = ? AND selection = ? AND version = ?",
+                         (fingerprint, qid, selection, version)).fetchone()
+        if row is None:
+            return None, None
+        rid, spec, used = row
+        tables = dict(db.execute("SELECT name, data FROM tables WHERE result = ?", (rid,)))
+        now = time.time()
+        if now - used > _TOUCH_AFTER:
+            db.execute("UPDATE results SET used = ? WHERE id = ?", (now, rid))
+        return spec, tables
+
+    def put(self, fingerprint, qid, selection, version, result):
+        try:
+            files = []
+            spec = json.dumps(artifacts.encode(result, f"q{qid:02d}", files))
+            blobs = []
+            for name, frame in files:
+                buf = io.BytesIO()
+                frame.to_parquet(buf)
+                blobs.append((name, buf.getvalue()))
+        except (TypeError, ValueError, NotImplementedError, pa.ArrowException):
+            return  # not something the encoding can hold; it just stays in memory
+        size = len(spec) + sum(len(data) for _, data in blobs)
+        try:
+            with self._lock:
+                db = self._db()
+                with db:
+                    db.execute("BEGIN IMMEDIATE")
+                    db.execute("DELETE FROM results "
+                               "WHERE fingerprint = ? AND qid = ? AND selection = ? AND version = ?",
+                               (fingerprint, qid, selection, version))
+                    rid = db.execute("INSERT INTO results (fingerprint, qid, selection, version, spec, size, used) "
+                                     "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                     (fingerprint, qid, selection, version, spec, size, time.time())).lastrowid
+                    db.executemany("INSERT INTO tables (result, name, data) VALUES (?, ?, ?)",
+                                   [(rid, name, data) for name, data in blobs])
+                    self._evict(db)
+        except (OSError, sqlite3.Error):
+            pass
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop oldest first down to 90% of the limit, so eviction isn't needed on every write
+        excess = total - int(self.max_bytes * 0.9)
+        doomed = []
+        for rid, size in db.execute("SELECT id, size FROM results ORDER BY used").fetchall():
+            if excess <= 0:
+                break
+            doomed.append((rid,))
+            excess -= size
+        db.executemany("DELETE FROM results WHERE id = ?", doomed)
+
+    def clear(self):
+        try:
+            with self._lock:
+                self._db().execute("DELETE FROM results")
+        except (OSError, sqlite3.Error):
+            pass
@@ -0,0 +1,253 @@
+# stream.py — chunked, parallel ingestion of CSVs too big to parse in one go
+#
+# A file (or every *.csv in a directory, e.g. one per season) is split into
+# byte ranges of about IPL_CHUNK_MB, cut at line ends. The ranges are parsed
+# on a thread pool, each with the file's header line in front, through the
+# same reader as loader.py (only the wanted columns, schema dtypes). At most
+# two ranges per worker are in flight, and each is reduced as soon as it is
+# parsed, so peak memory follows the chunk size and worker count, not the
+# size of the data.
+#
+# scan() reduces each chunk to its count cube and merges them (counts add, see
+# cube.py); that is all the cube questions need. Questions that read the raw
+# rows (source="rows" in panels.py) get rows() instead: each chunk's wanted
+# columns are spilled as an Arrow IPC part under loader's cache dir, and the
+# parts are then joined into one uncompressed IPC file, column by column, with
+# numeric columns and categorical codes assembled in mapped files rather than
+# on the heap. The frame is read from that file like loader's snapshots, by
+# memory-mapping it, so those columns stay backed by the file.
+#
+# Like incremental.py, rows are assumed to be one line each (no quoted
+# newlines), and the files of a directory to share one header.
+import hashlib
+import os
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import cube
+import loader
+import schema
+
+CHUNK_BYTES = int(os.environ.get("IPL_CHUNK_MB", "16")) * 2**20
+WORKERS = int(os.environ.get("IPL_INGEST_WORKERS", str(os.cpu_count() or 1)))
+
+SPILL_DIR = os.path.join(loader.CACHE_DIR, "spill")
+# rows per block when packing a validity bitmap (a multiple of 8)
+_BITMAP_ROWS = 8 << 20
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="ipl-ingest")
+_frames = loader.LRUCache()
+_spill_lock = threading.Lock()
+
+
+def _ranges(path, start=None, end=None, chunk_bytes=None):
+    """(header line, [(start, end), ...]) of the rows of one CSV, cut at line ends."""
+    chunk_bytes = chunk_bytes or CHUNK_BYTES
+    with open(path, "rb") as f:
+        head = f.readline()
+        pos = len(head) if start is None else start
+        end = os.path.getsize(path) if end is None else end
+        bounds = [pos]
+        while pos < end:
+            f.seek(min(pos + chunk_bytes, end))
+            f.readline()
+            pos = min(f.tell(), end)
+            bounds.append(pos)
+    if not head.endswith(b"\n"):
+        head += b"\n"
+    # a file without rows still yields one (empty) range, so it parses to an empty frame
+    return head, list(zip(bounds[:-1], bounds[1:])) or [(bounds[0], bounds[0])]
+
+
+def _parts(path, start=None, end=None):
+    for name in loader.csv_files(path):
+        head, ranges = _ranges(name, start, end)
+        for lo, hi in ranges:
+            yield name, head, lo, hi
+
+
+def _read(part, columns):
+    name, head, start, end = part
+    with open(name, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return loader.read_csv(head + data, columns)
+
+
+def _each(parts, fn):
+    """fn(part) for each part, computed on the pool but yielded in order."""
+    pending = deque()
+    for part in parts:
+        pending.append(_pool.submit(fn, part))
+        if len(pending) >= 2 * WORKERS:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _count(part, columns):
+    rows = _read(part, columns)
+    return cube.build(rows), len(rows)
+
+
+def scan(path, columns=cube.COLUMNS, start=None, end=None):
+    """(count cube, rows) of the CSV(s) at `path`, optionally of one file's bytes [start, end)."""
+    merged, held, total = None, [], 0
+    for built, rows in _each(_parts(path, start, end), lambda part: _count(part, columns)):
+        held.append(built)
+        total += rows
+        # merge once the held chunk cubes add up to the merged one, not after every chunk:
+        # each group is then re-merged a few times rather than once per chunk
+        if merged is None or sum(map(len, held)) >= len(merged):
+            merged = cube.merge(*([] if merged is None else [merged]), *held)
+            held = []
+    return cube.merge(merged, *held), total
+
+
+def spill_path_for(path, columns):
+    # one spill per source and projection; it's rewritten when the source changes
+    name = os.path.abspath(path) + "|" + ",".join(sorted(columns))
+    return os.path.join(SPILL_DIR, hashlib.blake2b(name.encode(), digest_size=16).hexdigest() + ".arrow")
+
+
+def _write_part(item, columns, folder):
+    index, part = item
+    table = loader._to_arrow(_read(part, columns))
+    path = os.path.join(folder, f"part-{index:06d}.arrow")
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+def _mapped(folder, name, dtype, length):
+    # a column assembled in a file rather than on the heap
+    if not length:
+        return np.empty(0, dtype)
+    return np.memmap(os.path.join(folder, name), dtype=dtype, mode="w+", shape=(length,))
+
+
+def _validity(codes, folder, name):
+    """Arrow validity bitmap (codes >= 0), packed a block at a time into a mapped file."""
+    bits = _mapped(folder, name, np.uint8, -(-len(codes) // 8))
+    for lo in range(0, len(codes), _BITMAP_ROWS):
+        packed = np.packbits(codes[lo:lo + _BITMAP_ROWS] >= 0, bitorder="little")
+        bits[lo // 8:lo // 8 + len(packed)] = packed
+    return bits
+
+
+def _categorical(chunks, categories, folder, name):
+    length = sum(len(c) for c in chunks)
+    codes = _mapped(folder, name + ".codes", np.int32, length)
+    pos = 0
+    for chunk in chunks:
+        s = loader._from_arrow(pa.table({name: chunk}))[name] if len(chunk) else None
+        if s is not None:
+            remap = categories.get_indexer(s.cat.categories)
+            local = s.cat.codes.to_numpy()
+            codes[pos:pos + len(local)] = np.where(local >= 0, remap[np.maximum(local, 0)] if len(remap) else -1, -1)
+        pos += len(chunk)
+    nulls = int(np.count_nonzero(codes < 0)) if length else 0
+    valid = pa.py_buffer(_validity(codes, folder, name + ".valid")) if nulls else None
+    indices = pa.Array.from_buffers(pa.int32(), length, [valid, pa.py_buffer(codes)], nulls)
+    # a file without rows has no categories at all, and a null dictionary can't be read back
+    dictionary = pa.array(categories, type=pa.string() if categories.dtype == object and categories.empty else None)
+    return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+
+def _numeric(chunks, folder, name):
+    # missing values become NaN, as when pandas parses the whole column
+    floats = any(pa.types.is_floating(c.type) or c.null_count for c in chunks)
+    dtype = np.dtype(np.float64) if floats else np.result_type(*[c.type.to_pandas_dtype() for c in chunks])
+    length = sum(len(c) for c in chunks)
+    values = _mapped(folder, name + ".values", dtype, length)
+    pos = 0
+    for chunk in chunks:
+        values[pos:pos + len(chunk)] = chunk.to_numpy(zero_copy_only=False)
+        pos += len(chunk)
+    return pa.Array.from_buffers(pa.from_numpy_dtype(dtype), length, [None, pa.py_buffer(values)], 0)
+
+
+def _column(chunks, categories, folder, name):
+    """One Arrow array of the parts' `name` columns; fixed-width ones backed by files in `folder`."""
+    if categories is not None:
+        return _categorical(chunks, categories, folder, name)
+    if all(pa.types.is_integer(c.type) or pa.types.is_floating(c.type) for c in chunks):
+        return _numeric(chunks, folder, name)
+    # anything else (e.g. free text or dates) is copied, as loader copies it on reading;
+    # pandas leaves a column missing throughout a chunk as float NaN, whatever it holds
+    typed = [c.type for c in chunks if c.null_count < len(c)] or [pa.string()]
+    return pa.concat_arrays([pa.nulls(len(c), typed[0]) if c.null_count == len(c) else c.cast(typed[0])
+                             for c in chunks])
+
+
+def _categories(tables, names):
+    # sorted union of the chunks' categories; the team columns share theirs, as in schema.py
+    found = None
+    for table in tables:
+        for name in names:
+            column = table.column(name)
+            if column.num_chunks:
+                chunk = pd.Index(column.chunk(0).dictionary.to_pandas())
+                found = chunk if found is None else found.union(chunk)
+    return pd.Index([], dtype=object) if found is None else found.sort_values()
+
+
+def _spill(path, columns, target, key):
+    """Parse the chunks' `columns` into Arrow IPC parts, then write them to `target` as one mapped table."""
+    work = f"{target}.{os.getpid()}.tmp"
+    shutil.rmtree(work, ignore_errors=True)
+    os.makedirs(work)
+    try:
+        parts = list(_each(enumerate(_parts(path)), lambda item: _write_part(item, columns, work)))
+        tables = [pa.ipc.open_file(pa.memory_map(p)).read_all() for p in parts]
+        names = tables[0].column_names
+        dictionaries = {c for c in names if all(pa.types.is_dictionary(t.schema.field(c).type) for t in tables)}
+        teams = [c for c in names if c in dictionaries and c in schema.TEAM_COLUMNS]
+        shared = _categories(tables, teams) if teams else None
+        arrays = []
+        for name in names:
+            categories = None
+            if name in dictionaries:
+                categories = shared if name in teams else _categories(tables, [name])
+            chunks = [t.column(name).chunk(0) if t.column(name).num_chunks else pa.array([], t.schema.field(name).type)
+                      for t in tables]
+            arrays.append(_column(chunks, categories, work, name))
+        table = pa.Table.from_arrays(arrays, names=names)
+        table = table.replace_schema_metadata({loader._SNAPSHOT_KEY: key.encode(), loader._LAYOUT_KEY: loader._LAYOUT.encode()})
+        tmp = os.path.join(work, "table.arrow")
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        # readers that still map the old file keep it, as with loader's snapshots
+        os.replace(tmp, target)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def rows(path, columns):
+    """The rows of the CSV(s) at `path`, only `columns`, parsed in chunks into a memory-mapped spill."""
+    if not columns:
+        # nothing to spill: a frame of the right length, without columns
+        return pd.DataFrame(index=pd.RangeIndex(sum(_each(_parts(path), lambda part: len(_read(part, []))))))
+    key = loader.fingerprint_path(path) + "|" + ",".join(sorted(columns)) + "|" + _LAYOUT
+    df = _frames.get(key)
+    if df is not None:
+        return df
+    target = spill_path_for(path, columns)
+    with _spill_lock:
+        df = loader._read_snapshot(target, key)
+        if df is None:
+            os.makedirs(SPILL_DIR, exist_ok=True)
+            _spill(path, columns, target, key)
+            df = loader._read_snapshot(target, key)
+    _frames.put(key, df)
+    return df
+
+
+# the code a spill's layout comes from, besides loader's encoding
+_LAYOUT = loader.layout_version(_write_part, _categorical, _numeric, _column, _categories, _spill)
@@ -0,0 +1,124 @@
+# synth.py — reproducible synthetic IPL matches tables
+#
+#   python synth.py --rows 1000000 --teams 10 --cities 30 --venues 40 --skew 1.0 -o matches_1m.csv
+#
+# Output has the exact columns of the real export (including the trailing
+# space in "Win_By_Wickets ") so the dashboard, batch.py and bench.py can run
+# on it unchanged. Teams, cities and venues are drawn with Zipf-like weights:
+# skew=0 is uniform, larger values concentrate matches on the first few.
+# String columns are built as categoricals, so 10M rows fit comfortably.
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["id", "Season", "City", "Date", "Team1", "Team2", "Toss_Winner", "Toss_Decision", "Result",
+           "DL_Applied", "Winner", "Win_By_Runs", "Win_By_Wickets ", "Player_Of_Match", "Venue",
+           "Umpire1", "Umpire2"]
+
+TEAMS = ["Mumbai Indians", "Chennai Super Kings", "Kolkata Knight Riders", "Royal Challengers Bangalore",
+         "Kings XI Punjab", "Rajasthan Royals", "Delhi Daredevils", "Sunrisers Hyderabad", "Deccan Chargers",
+         "Pune Warriors", "Gujarat Lions", "Rising Pune Supergiants", "Kochi Tuskers Kerala"]
+CITIES = ["Mumbai", "Kolkata", "Delhi", "Bangalore", "Hyderabad", "Chennai", "Jaipur", "Chandigarh", "Pune",
+          "Durban", "Bengaluru", "Visakhapatnam", "Centurion", "Ahmedabad", "Rajkot", "Mohali", "Indore",
+          "Dharamsala", "Johannesburg", "Cuttack", "Ranchi", "Port Elizabeth", "Cape Town", "Abu Dhabi",
+          "Sharjah", "Raipur", "Kochi", "Kanpur", "Nagpur", "Kimberley", "East London", "Bloemfontein"]
+
+
+def _names(known, n, prefix):
+    return known[:n] + [f"{prefix} {i + 1}" for i in range(len(known), n)]
+
+
+def _weights(n, skew):
+    w = 1.0 / np.arange(1, n + 1) ** skew
+    return w / w.sum()
+
+
+def _categorical(codes, names):
+    return pd.Categorical.from_codes(codes, categories=names)
+
+
+def generate(rows=10_000, teams=10, cities=30, venues=40, seasons=(2008, 2019), skew=1.0, seed=0):
+    """Return a DataFrame of `rows` synthetic matches."""
+    if teams < 2:
+        raise ValueError("need at least two teams")
+    rng = np.random.default_rng(seed)
+    team_names = _names(TEAMS, teams, "Team")
+    city_names = _names(CITIES, cities, "City")
+    venue_city = np.arange(venues) % cities
+    venue_names = [f"{city_names[c]} Stadium {i // cities + 1}" for i, c in enumerate(venue_city)]
+
+    venue = rng.choice(venues, rows, p=_weights(venues, skew))
+    strength = _weights(teams, skew)
+    t1 = rng.choice(teams, rows, p=strength)
+    t2 = (t1 + rng.integers(1, teams, rows)) % teams
+    toss_t1 = rng.random(rows) < 0.5
+    toss = np.where(toss_t1, t1, t2)
+    field = rng.random(rows) < 0.55
+
+    # the stronger side wins more often; a few matches are ties or washouts
+    win_t1 = rng.random(rows) < strength[t1] / (strength[t1] + strength[t2])
+    winner = np.where(win_t1, t1, t2)
+    outcome = rng.random(rows)
+    no_result = outcome < 0.005
+    tie = (outcome >= 0.005) & (outcome < 0.015)
+
+    batting_first = np.where(field, np.where(toss_t1, t2, t1), toss)
+    decisive = ~(no_result | tie)
+    won_batting = decisive & (winner == batting_first)
+    won_chasing = decisive & (winner != batting_first)
+
+    season = rng.integers(seasons[0], seasons[1] + 1, rows)
+    day = rng.integers(0, 61, rows)
+    date = (season - 1970).astype("datetime64[Y]").astype("datetime64[D]") + np.timedelta64(90, "D") + day
+
+    players = [f"Player {i + 1}" for i in range(500)]
+    umpires = [f"Umpire {i + 1}" for i in range(60)]
+
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "Season": season,
+        "City": _categorical(venue_city[venue], city_names),
+        "Date": date.astype(str),
+        "Team1": _categorical(t1, team_names),
+        "Team2": _categorical(t2, team_names),
+        "Toss_Winner": _categorical(toss, team_names),
+        "Toss_Decision": _categorical(field.astype(int), ["bat", "field"]),
+        "Result": _categorical(np.select([no_result, tie], [2, 1], 0), ["normal", "tie", "no result"]),
+        "DL_Applied": (rng.random(rows) < 0.02).astype(int),
+        "Winner": _categorical(np.where(no_result, -1, winner), team_names),
+        "Win_By_Runs": np.where(won_batting, rng.integers(1, 150, rows), 0),
+        "Win_By_Wickets ": np.where(won_chasing, rng.integers(1, 11, rows), 0),
+        "Player_Of_Match": _categorical(np.where(no_result, -1, rng.integers(0, len(players), rows)), players),
+        "Venue": _categorical(venue, venue_names),
+        "Umpire1": _categorical(rng.integers(0, len(umpires), rows), umpires),
+        "Umpire2": _categorical(rng.integers(0, len(umpires), rows), umpires),
+    }, columns=COLUMNS)
+
+
+def write_csv(path, **kwargs):
+    df = generate(**kwargs)
+    df.to_csv(path, index=False, chunksize=500_000)
+    return df
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write a synthetic IPL matches CSV.")
+    ap.add_argument("-o", "--out", required=True, help="output CSV path")
+    ap.add_argument("--rows", type=int, default=10_000)
+    ap.add_argument("--teams", type=int, default=10)
+    ap.add_argument("--cities", type=int, default=30)
+    ap.add_argument("--venues", type=int, default=40)
+    ap.add_argument("--skew", type=float, default=1.0, help="Zipf exponent for team/venue popularity (0 = uniform)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    write_csv(args.out, rows=args.rows, teams=args.teams, cities=args.cities, venues=args.venues,
+              skew=args.skew, seed=args.seed)
+    print(f"wrote {args.rows} rows to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# warmup.py — answer every question in the background right after a load
+#
+# Without this, whoever first opens a panel on a fresh dataset waits for its
+# computation. start() instead queues all of the dataset's questions on a
+# small shared thread pool as soon as the data is loaded; a panel opened later
+# only waits for its own future, which is usually already done by then.
+# Threads rather than processes: the answers land in panels' in-process memo
+# (and the result store) and the workers share the loaded frame and cube,
+# while pandas releases the GIL in most of the heavy lifting.
+#
+# One warm-up runs per dataset fingerprint, however many sessions ask for it.
+# Each job times itself, since a panel served from its future only waits: the
+# work (and its CPU time) happened on a pool thread.
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import loader
+import panels
+
+WORKERS = int(os.environ.get("IPL_WARMUP_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="ipl-warmup")
+_runs = loader.LRUCache()
+_runs_lock = threading.Lock()
+
+
+class Warmup:
+    """Futures of one dataset's answers, by question id."""
+
+    def __init__(self, futures):
+        self.futures = futures
+
+    def __contains__(self, qid):
+        return qid in self.futures
+
+    def progress(self):
+        """(answers ready, answers scheduled)"""
+        return sum(f.done() for f in self.futures.values()), len(self.futures)
+
+    def done(self):
+        return all(f.done() for f in self.futures.values())
+
+    def result(self, qid):
+        # blocks on this question only. A failed answer is dropped before its
+        # exception is re-raised, so it isn't served again; callers compute it inline.
+        future = self.futures[qid]
+        try:
+            return future.result()[0]
+        except Exception:
+            self.futures.pop(qid, None)
+            raise
+
+    def cost(self, qid):
+        """{"compute_ms", "cpu_ms"} of the job that answered `qid` (once result() returned)."""
+        return self.futures[qid].result()[1]
+
+
+def _once(load):
+    # all jobs share one call to load(), so the frame is parsed once, not per worker
+    # (and not at all if every question's stage is already provided)
+    lock = threading.Lock()
+    frame = []
+
+    def call():
+        with lock:
+            if not frame:
+                frame.append(load())
+        return frame[0]
+
+    return call
+
+
+def _answer(qid, load, fingerprint):
+    wall, cpu = time.perf_counter(), time.thread_time()
+    value = panels.result(panels.get(qid), load, fingerprint)
+    wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+    return value, {"compute_ms": round(wall * 1000, 3), "cpu_ms": round(cpu * 1000, 3)}
+
+
+def start(load, fingerprint, qids):
+    """Schedule the answers to `qids` for this dataset (once); load() returns its frame."""
+    with _runs_lock:
+        run = _runs.get(fingerprint)
+        if run is None:
+            load = _once(load)
+            run = Warmup({qid: _pool.submit(_answer, qid, load, fingerprint) for qid in qids})
+            _runs.put(fingerprint, run)
+        return run